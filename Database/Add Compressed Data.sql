@@ -0,0 +1,11 @@
+ALTER TABLE svg.animeStats ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.socialStats ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.mangaStats ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.animeGenres ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.animeTags ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.animeVoiceActors ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.animeStudios ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.animeStaff ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.mangaGenres ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.mangaTags ADD COLUMN IF NOT EXISTS data_gz BYTEA;
+ALTER TABLE svg.mangaStaff ADD COLUMN IF NOT EXISTS data_gz BYTEA;
@@ -0,0 +1,24 @@
+-- Keep only the newest SVG of each user before making user_id unique
+DELETE FROM svg.animeStats a USING svg.animeStats b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.socialStats a USING svg.socialStats b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.mangaStats a USING svg.mangaStats b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.animeGenres a USING svg.animeGenres b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.animeTags a USING svg.animeTags b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.animeVoiceActors a USING svg.animeVoiceActors b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.animeStudios a USING svg.animeStudios b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.animeStaff a USING svg.animeStaff b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.mangaGenres a USING svg.mangaGenres b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.mangaTags a USING svg.mangaTags b WHERE a.user_id = b.user_id AND a.id < b.id;
+DELETE FROM svg.mangaStaff a USING svg.mangaStaff b WHERE a.user_id = b.user_id AND a.id < b.id;
+
+ALTER TABLE svg.animeStats ADD UNIQUE (user_id);
+ALTER TABLE svg.socialStats ADD UNIQUE (user_id);
+ALTER TABLE svg.mangaStats ADD UNIQUE (user_id);
+ALTER TABLE svg.animeGenres ADD UNIQUE (user_id);
+ALTER TABLE svg.animeTags ADD UNIQUE (user_id);
+ALTER TABLE svg.animeVoiceActors ADD UNIQUE (user_id);
+ALTER TABLE svg.animeStudios ADD UNIQUE (user_id);
+ALTER TABLE svg.animeStaff ADD UNIQUE (user_id);
+ALTER TABLE svg.mangaGenres ADD UNIQUE (user_id);
+ALTER TABLE svg.mangaTags ADD UNIQUE (user_id);
+ALTER TABLE svg.mangaStaff ADD UNIQUE (user_id);
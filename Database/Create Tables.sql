@@ -13,65 +13,76 @@ CREATE TABLE svg.statcards (
 CREATE TABLE svg.animeStats (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.socialStats (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.mangaStats (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.animeGenres (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.animeTags (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.animeVoiceActors (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.animeStudios (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.animeStaff (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.mangaGenres (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.mangaTags (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
 
 CREATE TABLE svg.mangaStaff (
     id SERIAL PRIMARY KEY,
     data TEXT,
-    user_id INTEGER NOT NULL REFERENCES svg.statcards (user_id)
+    data_gz BYTEA,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES svg.statcards (user_id)
 );
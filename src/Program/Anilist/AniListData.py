@@ -4,11 +4,29 @@ This module is used to fetch and process data from AniList.
 It uses the requests module to send HTTP requests and the queries module to handle GraphQL queries.
 """
 # Import necessary modules
+import time
+
 import requests
 from Program.Anilist import queries
-from Program.Utils.logger import log_message
+from Program.Utils.cache import TTLCache
+from Program.Utils.logger import DEBUG_ENABLED, log_message
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout
 
+ANILIST_API_URL = "https://graphql.anilist.co"
+
+# Shared session, so the connections to AniList are kept alive and reused across
+# requests instead of doing a new TCP and TLS handshake for every query.
+# The pool is sized for the server threads that can query AniList at once.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+# The data fetched for each username, user ID and set of keys in the last hour,
+# so the scheduled regeneration doesn't query AniList again for the same cards
+# and count against its rate limit. A user generating their cards always gets
+# fresh data
+_DATA_CACHE = TTLCache(maxsize=256, ttl=3600)
+
 
 def get_user_id(username):
     """
@@ -25,8 +43,8 @@ def get_user_id(username):
         Exception: If the request to the AniList API fails for a reason other than a timeout.
     """
     try:
-        user_id_response = requests.post(
-            "https://graphql.anilist.co",
+        user_id_response = _SESSION.post(
+            ANILIST_API_URL,
             json={
                 "query": queries.USER_ID,
                 "variables": {"userName": username},
@@ -67,6 +85,43 @@ def get_user_id(username):
     )
 
 
+def post_query(payload, retries=0):
+    """
+    Sends a GraphQL query to AniList.
+
+    When AniList answers that the rate limit was exceeded (HTTP 429), the query is
+    sent again after waiting the time given by its Retry-After header, up to
+    retries times.
+
+    Parameters:
+    payload (dict): The query and its variables.
+    retries (int, optional): How many times to retry a rate limited query.
+
+    Returns:
+    requests.Response: The response of AniList.
+
+    Raises:
+    requests.exceptions.HTTPError: If the query is still rate limited after the retries.
+    """
+    for attempt in range(retries + 1):
+        response = _SESSION.post(ANILIST_API_URL, json=payload, timeout=10)
+        if response.status_code != 429:
+            return response
+        if attempt < retries:
+            try:
+                delay = float(response.headers.get("Retry-After", 60))
+            except ValueError:
+                delay = 60
+            log_message(
+                f"Rate limit exceeded, retrying in {delay:g} seconds", "warning"
+            )
+            time.sleep(delay)
+
+    raise requests.exceptions.HTTPError(
+        "AniList rate limit exceeded", response=response
+    )
+
+
 def fetch_anime_data(response_data, keys):
     """
     Extracts anime data from the response data.
@@ -262,16 +317,24 @@ def fetch_social_data(response_data):
     return data
 
 
-def fetch_anilist_data(username, keys):
+def fetch_anilist_data(username, keys, user_id=None, retries=0, use_cache=True):
     """
     Fetches data from AniList for a specific user.
 
     The function sends a request to the AniList API to fetch data for the specified user.
-    It then extracts the desired data from the response using the provided keys.
+    Only the parts of the data needed for the provided keys are requested, and
+    they are then extracted from the response. The result is cached for an hour
+    per username, user ID and keys.
 
     Parameters:
     username (str): The username of the AniList user.
     keys (list): The keys to extract from the response data.
+    user_id (int, optional): The AniList ID of the user, fetched from AniList if
+    it isn't known.
+    retries (int, optional): How many times to retry the query after waiting when
+    AniList's rate limit is exceeded. The requests of the site don't wait.
+    use_cache (bool, optional): Whether to return the cached data if there is any.
+    The data fetched is cached either way.
 
     Returns:
     dict: A dictionary containing the extracted data, or None if an error occurred.
@@ -279,25 +342,38 @@ def fetch_anilist_data(username, keys):
     Raises:
     requests.exceptions.RequestException: If a network error occurred.
     """
+    cache_key = (username, user_id, tuple(sorted(keys)))
+    cached = _DATA_CACHE.get(cache_key) if use_cache else None
+    if cached is not None:
+        if DEBUG_ENABLED:
+            log_message(f"Using cached data for {username}", "debug")
+        return cached
+
     try:
-        log_message(f"Started fetching data for {username}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started fetching data for {username}", "debug")
 
-        user_id = get_user_id(username)
+        if user_id is None:
+            user_id = get_user_id(username)
 
         data = {key: None for key in keys}
 
         try:
-            response = requests.post(
-                "https://graphql.anilist.co",
-                json={
+            response = post_query(
+                {
                     "query": queries.USER_ANIME_MANGA_SOCIAL_STATS,
-                    "variables": {"userName": username, "userId": user_id},
+                    "variables": {
+                        "userName": username,
+                        "userId": user_id,
+                        **{key: key in keys for key in queries.OPTIONAL_KEYS},
+                    },
                 },
-                timeout=10,
+                retries,
             )
 
             response_data = response.json()
-            log_message(f"Data fetched for {username}: {response_data}", "debug")
+            if DEBUG_ENABLED:
+                log_message(f"Data fetched for {username}: {response_data}", "debug")
 
             # Check for 'Internal Server Error' or 'Status': 500
             if (
@@ -322,27 +398,34 @@ def fetch_anilist_data(username, keys):
                 raise ValueError(error_message)
 
             try:
-                log_message(
-                    f"Started fetching anime data for {username}, Keys: {keys}", "debug"
-                )
+                if DEBUG_ENABLED:
+                    log_message(
+                        f"Started fetching anime data for {username}, Keys: {keys}",
+                        "debug",
+                    )
                 data.update(fetch_anime_data(response_data, keys))
-                log_message(
-                    f"Started fetching manga data for {username}, Keys: {keys}", "debug"
-                )
+                if DEBUG_ENABLED:
+                    log_message(
+                        f"Started fetching manga data for {username}, Keys: {keys}",
+                        "debug",
+                    )
                 data.update(fetch_manga_data(response_data, keys))
-                log_message(
-                    f"Started fetching social data for {username}, Keys: {keys}",
-                    "debug",
-                )
-                data.update(fetch_social_data(response_data))
+                if "socialStats" in keys:
+                    if DEBUG_ENABLED:
+                        log_message(
+                            f"Started fetching social data for {username}, Keys: {keys}",
+                            "debug",
+                        )
+                    data.update(fetch_social_data(response_data))
             except Exception as e:  # pylint: disable=W0703
                 log_message(f"Error: {e}", "error")
                 raise e
         except requests.exceptions.RequestException as error:
-            if error.response and error.response.status_code == 429:
+            if error.response is not None and error.response.status_code == 429:
                 log_message("Rate limit exceeded", "error")
                 raise error
             raise error
+        _DATA_CACHE.set(cache_key, (data, user_id))
         return data, user_id
     except requests.exceptions.RequestException as error:
         log_message(f"Failed to fetch data for user {username}: {error}", "error")
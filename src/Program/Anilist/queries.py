@@ -12,8 +12,34 @@ USER_ID = """
     }
 """
 
+# The keys whose part of USER_ANIME_MANGA_SOCIAL_STATS is only fetched when requested,
+# each one is passed to the query as a Boolean variable of the same name
+OPTIONAL_KEYS = (
+    "animeGenres",
+    "animeTags",
+    "animeVoiceActors",
+    "animeStudios",
+    "animeStaff",
+    "mangaGenres",
+    "mangaTags",
+    "mangaStaff",
+    "socialStats",
+)
+
 USER_ANIME_MANGA_SOCIAL_STATS = """
-    query ($userName: String, $userId: Int!) {
+    query (
+        $userName: String
+        $userId: Int!
+        $animeGenres: Boolean!
+        $animeTags: Boolean!
+        $animeVoiceActors: Boolean!
+        $animeStudios: Boolean!
+        $animeStaff: Boolean!
+        $mangaGenres: Boolean!
+        $mangaTags: Boolean!
+        $mangaStaff: Boolean!
+        $socialStats: Boolean!
+    ) {
         User(name: $userName) {
             statistics {
                 anime {
@@ -22,17 +48,17 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                     minutesWatched
                     meanScore
                     standardDeviation
-                    genres(limit: 6, sort: COUNT_DESC) {
+                    genres(limit: 6, sort: COUNT_DESC) @include(if: $animeGenres) {
                         genre
                         count
                     }
-                    tags(limit: 6, sort: COUNT_DESC) {
+                    tags(limit: 6, sort: COUNT_DESC) @include(if: $animeTags) {
                         tag {
                             name
                         }
                         count
                     }
-                    voiceActors(limit: 6, sort: COUNT_DESC) {
+                    voiceActors(limit: 6, sort: COUNT_DESC) @include(if: $animeVoiceActors) {
                         voiceActor {
                             name {
                                 full
@@ -40,13 +66,13 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                         }
                         count
                     }
-                    studios(limit: 6, sort: COUNT_DESC) {
+                    studios(limit: 6, sort: COUNT_DESC) @include(if: $animeStudios) {
                         studio {
                             name
                         }
                         count
                     }
-                    staff(limit: 6, sort: COUNT_DESC) {
+                    staff(limit: 6, sort: COUNT_DESC) @include(if: $animeStaff) {
                         staff {
                             name {
                                 full
@@ -61,17 +87,17 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                     volumesRead
                     meanScore
                     standardDeviation
-                    genres(limit: 6, sort: COUNT_DESC) {
+                    genres(limit: 6, sort: COUNT_DESC) @include(if: $mangaGenres) {
                         genre
                         count
                     }
-                    tags(limit: 6, sort: COUNT_DESC) {
+                    tags(limit: 6, sort: COUNT_DESC) @include(if: $mangaTags) {
                         tag {
                             name
                         }
                         count
                     }
-                    staff(limit: 6, sort: COUNT_DESC) {
+                    staff(limit: 6, sort: COUNT_DESC) @include(if: $mangaStaff) {
                         staff {
                             name {
                                 full
@@ -81,13 +107,13 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                     }
                 }
             }
-            stats {
+            stats @include(if: $socialStats) {
                 activityHistory {
                     amount
                 }
             }
         }
-        followersPage: Page(perPage: 1) {
+        followersPage: Page(perPage: 1) @include(if: $socialStats) {
             pageInfo {
                 total
             }
@@ -95,7 +121,7 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                 id
             }
         }
-        followingPage: Page(perPage: 1) {
+        followingPage: Page(perPage: 1) @include(if: $socialStats) {
             pageInfo {
                 total
             }
@@ -103,7 +129,7 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                 id
             }
         }
-        threadsPage: Page {
+        threadsPage: Page @include(if: $socialStats) {
             pageInfo {
                 total
             }
@@ -111,7 +137,7 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                 id
             }
         }
-        threadCommentsPage: Page(perPage: 1) {
+        threadCommentsPage: Page(perPage: 1) @include(if: $socialStats) {
             pageInfo {
                 total
             }
@@ -119,7 +145,7 @@ USER_ANIME_MANGA_SOCIAL_STATS = """
                 id
             }
         }
-        reviewsPage: Page(perPage: 1) {
+        reviewsPage: Page(perPage: 1) @include(if: $socialStats) {
             pageInfo {
                 total
             }
@@ -15,10 +15,15 @@ class Base(db.Model):
     __abstract__ = True
     __table_args__ = {"schema": "svg"}
     id = db.Column(db.Integer, primary_key=True)
-    data = db.Column(db.Text, nullable=True)
+    # The SVGs are only loaded when they are accessed, their columns are selected
+    # directly wherever they are needed
+    data = db.mapped_column(db.Text, nullable=True, deferred=True)
+    data_gz = db.mapped_column(
+        db.LargeBinary, nullable=True, deferred=True
+    )  # Gzipped copy of data
     user_id = db.Column(
-        db.Integer, db.ForeignKey("svg.statcards.user_id")
-    )  # Reference to Anilist user ID in StatCard
+        db.Integer, db.ForeignKey("svg.statcards.user_id"), unique=True
+    )  # Reference to Anilist user ID in StatCard, each user has one SVG per table
 
     def __repr__(self):
         return f"<{self.__class__.__name__} {self.id}>"
@@ -52,6 +57,30 @@ class StatCard(db.Model):
         db.Integer, db.ForeignKey("svg.users.userid"), nullable=False, unique=True
     )
 
+    @staticmethod
+    def split_keys(keys):
+        """
+        Splits the keys column of a StatCard into a list.
+
+        Parameters:
+        keys (str): The comma-joined keys.
+
+        Returns:
+        list: The keys, in the order they were added.
+        """
+        return keys.split(",") if keys else []
+
+    @property
+    def key_list(self):
+        """
+        list: The keys of the SVGs stored for the user, in the order they were added.
+        """
+        return self.split_keys(self.keys)
+
+    @key_list.setter
+    def key_list(self, keys):
+        self.keys = ",".join(keys)
+
     def __repr__(self):
         return f"<StatCard {self.id}>"
 
@@ -0,0 +1,104 @@
+"""
+This module provides a small in-process cache for data that is read much more
+often than it changes, like the generated SVGs.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A thread-safe least recently used cache whose entries expire after a while.
+
+    Entries are dropped once they are older than ttl seconds, and the least
+    recently used entry is dropped when the cache holds more than maxsize entries.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        """
+        Parameters:
+        maxsize (int): The maximum number of entries to keep.
+        ttl (int): How long an entry is kept, in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None, max_age=None):
+        """
+        Returns the value cached for the key.
+
+        Parameters:
+        key (hashable): The key of the entry.
+        default: The value to return if the key isn't cached or has expired.
+        max_age (int): How old the entry may be, in seconds, for this call only.
+        The entry is kept for the callers that accept older entries.
+
+        Returns:
+        The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            cached_at, value = entry
+            age = time.monotonic() - cached_at
+            if age > self.ttl:
+                del self._entries[key]
+                return default
+            if max_age is not None and age > max_age:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Caches the value for the key, dropping the least recently used entry if
+        the cache is full.
+
+        Parameters:
+        key (hashable): The key of the entry.
+        value: The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Removes the entry for the key.
+
+        Parameters:
+        key (hashable): The key of the entry.
+        default: The value to return if the key isn't cached.
+
+        Returns:
+        The removed value, or default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def pop_where(self, predicate):
+        """
+        Removes the entries whose key matches.
+
+        Parameters:
+        predicate (callable): Called with the key of each entry, the entry is
+        removed when it returns True.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
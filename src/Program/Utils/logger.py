@@ -2,12 +2,13 @@
 This module is used for logging messages with different levels.
 """
 
+import atexit
 import datetime
 import glob
-import inspect
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 
 # Get the current timestamp
@@ -19,54 +20,51 @@ def cleanup_log_files():
     Cleans up log files in the 'logs' directory.
 
     This function deletes the oldest log files in the 'logs' directory until there
-    are only 30 left for each type of log file (debug and log). The function prints
-    the number of log files before and after deletion, as well as the name of each
-    file that's being deleted.
+    are only 10 left for each type of log file (debug and log). The function prints
+    the number of log files before and after deletion.
     """
     # Limit the number of log files
     for pattern in ["logs/debug_*.log", "logs/log_*.log"]:
         log_type = "debug" if "debug" in pattern else "log"
         log_files = sorted(glob.glob(pattern))
         print(f"Before deletion: {len(log_files)} {log_type} files")
-        while len(log_files) > 10:
-            os.remove(log_files[0])
-            log_files = sorted(glob.glob(pattern))
-        print(f"After deletion: {len(log_files)} {log_type} files\n")
+        # The names start with their timestamp, so the oldest files sort first
+        for log_file in log_files[:-10]:
+            os.remove(log_file)
+        print(f"After deletion: {min(len(log_files), 10)} {log_type} files\n")
 
 
-# Call the cleanup function when the server starts
-if "unittest" not in sys.modules:
-    cleanup_log_files()
+# The logger used by log_message, its handlers are added once by init_logger
+_LOGGER = logging.getLogger("Main_Logger")
 
+# The logging level of each message level name
+_LEVELS = {
+    "error": logging.ERROR,
+    "debug": logging.DEBUG,
+    "warning": logging.WARNING,
+}
 
-def log_message(message, level="info"):
+
+def init_logger():
     """
-    Logs a message with a given level.
+    Sets up the file handlers of the logger.
 
-    Parameters:
-    message (str): The message to log.
-    level (str): The level of the message. Default is 'info'.
+    The handlers are only created and added the first time this is called, so
+    log_message doesn't have to build them for every message. The logger itself
+    only puts the records on a queue, they are written to the files by a
+    background thread so logging doesn't wait on file I/O.
     """
-    if "unittest" in sys.modules:
+    if _LOGGER.handlers:
         return
 
-    # Get the caller information
-    caller = inspect.stack()[1]
-    function_name = caller[3]
-    line_number = caller[2]
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = os.path.relpath(caller[1], start=script_dir)
-
-    # Create a logger
-    logger = logging.getLogger("Main_Logger")
-    logger.setLevel(logging.DEBUG)
+    # The level can be raised in production to skip the debug messages
+    _LOGGER.setLevel(os.getenv("LOG_LEVEL", "DEBUG").upper())
 
     # Don't propagate to the root logger
-    logger.propagate = False
+    _LOGGER.propagate = False
 
     # Create logs directory if it doesn't exist
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
+    os.makedirs("logs", exist_ok=True)
 
     # Create file handlers
     log_filename = os.path.join("logs", f"log_{timestamp}.log")
@@ -81,28 +79,49 @@ def log_message(message, level="info"):
 
     # Create a logging format
     formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        "%(asctime)s - %(name)s - %(levelname)s - "
+        "File: %(filename)s, Function: %(funcName)s, Line: %(lineno)d, "
+        "Message: %(message)s"
     )
     log_handler.setFormatter(formatter)
     debug_handler.setFormatter(formatter)
 
-    # Add the handlers to the logger
-    if not logger.hasHandlers():
-        logger.addHandler(log_handler)
-        logger.addHandler(debug_handler)
-
-    # Log the message
-    message = (
-        f"File: {file_name}, "
-        f"Function: {function_name}, "
-        f"Line: {line_number}, "
-        f"Message: {message}"
+    # Write the queued records to the files on a background thread
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, log_handler, debug_handler, respect_handler_level=True
     )
-    if level.lower() == "error":
-        logger.error(message)
-    elif level.lower() == "debug":
-        logger.debug(message)
-    elif level.lower() == "warning":
-        logger.warning(message)
-    else:
-        logger.info(message)
+    listener.start()
+
+    # Write the remaining records when the server stops
+    atexit.register(listener.stop)
+
+    # Add the queue handler to the logger
+    _LOGGER.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+# Whether messages are logged at all, they aren't while the tests run
+LOGGING_ENABLED = "unittest" not in sys.modules
+
+# Call the cleanup function and set up the logger when the server starts
+if LOGGING_ENABLED:
+    cleanup_log_files()
+    init_logger()
+
+# Whether debug messages are logged, so callers can skip building them
+DEBUG_ENABLED = LOGGING_ENABLED and _LOGGER.isEnabledFor(logging.DEBUG)
+
+
+def log_message(message, level="info"):
+    """
+    Logs a message with a given level.
+
+    Parameters:
+    message (str): The message to log.
+    level (str): The level of the message. Default is 'info'.
+    """
+    if not LOGGING_ENABLED:
+        return
+
+    # Log the message, attributed to the caller of this function
+    _LOGGER.log(_LEVELS.get(level.lower(), logging.INFO), message, stacklevel=2)
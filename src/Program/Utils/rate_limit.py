@@ -0,0 +1,34 @@
+"""
+This module provides a rate limiter shared by threads, used to keep the requests
+sent to AniList under its rate limit.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe rate limiter that spaces calls at least interval seconds apart.
+    """
+
+    def __init__(self, interval):
+        """
+        Parameters:
+        interval (float): The least time between two calls, in seconds.
+        """
+        self.interval = interval
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until the caller may make its call. The callers are let through one
+        at a time, each one interval after the previous one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            call_time = max(now, self._next_call)
+            self._next_call = call_time + self.interval
+        if call_time > now:
+            time.sleep(call_time - now)
@@ -5,9 +5,139 @@ This module is used to generate SVG html.
 
 import math
 import os
-
+import re
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from string import Template
+
+from jinja2 import (  # pylint: disable=E0401
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+)
 from markupsafe import Markup  # pylint: disable=E0401
-from Program.Utils.logger import log_message  # pylint: disable=E0401
+from Program.Utils.logger import DEBUG_ENABLED, log_message  # pylint: disable=E0401
+
+# Shared pool used to render the SVGs of a user concurrently
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Comments and whitespace stripped from the templates and styles when they're loaded
+_COMMENT_RE = re.compile(r"<!--.*?-->|/\*.*?\*/", re.S)
+_MARKUP_SPACE_RE = re.compile(r"\s+(?=/?>)|(?<=>)\s+(?=<)")
+_STYLES_SPACE_RE = re.compile(r"\s*([{};,])\s*|(?<=:)\s+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def minify_markup(source):
+    """
+    Minifies an SVG template by removing its comments and collapsing its whitespace.
+    Parameters:
+    source (str): The source of the template.
+    Returns:
+    str: The minified source.
+    """
+    source = _MARKUP_SPACE_RE.sub("", _COMMENT_RE.sub("", source))
+    return _SPACE_RE.sub(" ", source).strip()
+
+
+def minify_styles(styles):
+    """
+    Minifies CSS by removing its comments and the whitespace around its rules.
+    Parameters:
+    styles (str): The CSS to minify.
+    Returns:
+    str: The minified CSS.
+    """
+    styles = _STYLES_SPACE_RE.sub(
+        lambda match: match.group(1) or "", _COMMENT_RE.sub("", styles)
+    )
+    return _SPACE_RE.sub(" ", styles).strip()
+
+
+class MinifyingFileSystemLoader(FileSystemLoader):
+    """
+    Loads the SVG templates minified, so every render and response is smaller.
+    """
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_markup(source), filename, uptodate
+
+
+# The src directory, so the templates are found whatever the working directory is
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SVG_TEMPLATES_DIR = os.path.join(SRC_DIR, "Pages", "SVGs")
+
+# The SVG templates are compiled once and reused for every render,
+# they are only recompiled when the template file is modified.
+# The compiled templates are also cached on disk so new workers don't parse them again.
+SVG_TEMPLATES = Environment(
+    loader=MinifyingFileSystemLoader(SVG_TEMPLATES_DIR),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=True,
+    cache_size=400,
+    keep_trailing_newline=True,
+)
+
+# Styles shared by all of the SVGs
+DEFAULT_STATS_CSS_PATH = os.path.join(
+    SRC_DIR, "public", "styles", "SVGs", "DefaultStatsStyles.css"
+)
+
+# Template shared by the extra anime and manga SVGs
+EXTRA_STATS_SVG_TEMPLATE = "extraAnime&MangaStatsSVG.html"
+
+# The font size the header of the extra stats SVGs is shown at, and the width it
+# has from its 25px offset to the right edge of the 320px wide card
+HEADER_FONT_SIZE = 16
+HEADER_MAX_WIDTH = 295
+
+# The first milestones of the anime and manga stats, after which there is one every 1000
+MILESTONES = (100, 250, 500, 750, 1000)
+
+# Circumference of the milestone progress circle, which has a radius of 40
+CIRCLE_CIRCUMFERENCE = 2 * math.pi * 40
+
+# Placeholder SVG used when there is no generator for a title
+_FALLBACK_SVG = Template(
+    '<svg xmlns="http://www.w3.org/2000/svg"><g transform="translate(0, 0)">'
+    '<text x="0" y="50" font-size="35">$title: $value</text></g></svg>'
+)
+
+
+def _freeze(value):
+    """
+    Converts a value into a hashable equivalent so it can be used as a cache key.
+    Parameters:
+    value (any): The value to convert. Dicts and lists are converted recursively.
+    Returns:
+    any: A hashable representation of the value.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class _FrozenValue:
+    """
+    Wraps the value of an SVG so it can be passed to a cached function.
+    The original value is kept for rendering, the frozen value is used for hashing.
+    """
+
+    __slots__ = ("value", "key")
+
+    def __init__(self, value):
+        self.value = value
+        self.key = _freeze(value)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, _FrozenValue) and self.key == other.key
 
 
 def generate_svg(title, value, username, colors, card_type="Default"):
@@ -21,59 +151,18 @@ def generate_svg(title, value, username, colors, card_type="Default"):
     colors (str): The colors to be used in the SVG.
     card_type (str, optional): The type of the card. Defaults to "Default".
     Returns:
-    str: The generated SVG.
+    str: The generated SVG, or None if there is nothing to generate.
     """
     try:
-        log_message(f"Started generating svg for {title}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started generating svg for {title}", "debug")
 
         if value is None:
             return None
 
-        title_to_function = {
-            "animeStats": generate_animeStats_svg,
-            "mangaStats": generate_mangaStats_svg,
-            "socialStats": generate_socialStats_svg,
-            "animeGenres": lambda v, u, c, t: generate_extraAnimeStats_svg(
-                v, u, "genre", c, t
-            ),
-            "animeTags": lambda v, u, c, t: generate_extraAnimeStats_svg(
-                v, u, "tag", c, t
-            ),
-            "animeVoiceActors": lambda v, u, c, t: generate_extraAnimeStats_svg(
-                v, u, "voiceActor", c, t
-            ),
-            "animeStudios": lambda v, u, c, t: generate_extraAnimeStats_svg(
-                v, u, "studio", c, t
-            ),
-            "animeStaff": lambda v, u, c, t: generate_extraAnimeStats_svg(
-                v, u, "staff", c, t
-            ),
-            "mangaGenres": lambda v, u, c, t: generate_extraMangaStats_svg(
-                v, u, "genre", c, t
-            ),
-            "mangaTags": lambda v, u, c, t: generate_extraMangaStats_svg(
-                v, u, "tag", c, t
-            ),
-            "mangaStaff": lambda v, u, c, t: generate_extraMangaStats_svg(
-                v, u, "staff", c, t
-            ),
-        }
-
-        function_to_execute = title_to_function.get(title)
-
-        if function_to_execute is not None:
-            result = function_to_execute(value, username, colors, card_type)
-        else:
-            log_message("Invalid title, generating placeholder svg", "debug")
-            result = Markup(
-                f"""
-                <svg xmlns="http://www.w3.org/2000/svg">
-                    <g transform="translate(0, 0)">
-                        <text x="0" y="50" font-size="35">{title}: {value}</text>
-                    </g>
-                </svg>
-            """
-            )
+        result = _render_svg(
+            title, _FrozenValue(value), username, tuple(colors), card_type
+        )
 
         log_message(f"SVG generated successfully for {title}", "info")
         return result
@@ -85,6 +174,96 @@ def generate_svg(title, value, username, colors, card_type="Default"):
         ) from e
 
 
+def generate_all_svgs(values, username, colors, card_type="Default"):
+    """
+    Generates several SVGs for a user concurrently, a single SVG is generated
+    in the calling thread.
+    The cached SVGs are dropped first if the styles or a template was modified.
+    Parameters:
+    values (dict): The value to be displayed in each SVG, by the title of the SVG.
+    username (str): The username to be displayed in the SVGs.
+    colors (list): The colors to be used in the SVGs.
+    card_type (str, optional): The type of the cards. Defaults to "Default".
+    Returns:
+    dict: The generated SVGs by title, in the same order as values,
+    with None for every title that had no value.
+    """
+    refresh_render_cache()
+
+    # A single SVG is generated right away, handing it to a thread would only add overhead
+    if len(values) == 1:
+        return {
+            title: generate_svg(title, value, username, colors, card_type)
+            for title, value in values.items()
+        }
+
+    futures = {
+        title: _EXECUTOR.submit(generate_svg, title, value, username, colors, card_type)
+        for title, value in values.items()
+    }
+    return {title: future.result() for title, future in futures.items()}
+
+
+def preload_templates():
+    """
+    Loads the styles and compiles every SVG template, so the threads rendering
+    the SVGs find them cached instead of each loading them on a cold cache.
+    """
+    load_styles(DEFAULT_STATS_CSS_PATH)
+    for template_name in SVG_TEMPLATES.list_templates():
+        SVG_TEMPLATES.get_template(template_name)
+
+
+# The files the SVGs are rendered from, the templates are listed once since a new
+# template comes with a new generator anyway
+_RENDER_SOURCES = (DEFAULT_STATS_CSS_PATH,) + tuple(
+    os.path.join(SVG_TEMPLATES_DIR, template_name)
+    for template_name in SVG_TEMPLATES.list_templates()
+)
+
+# The modification times of the files the SVGs cached by _render_svg were rendered from
+_RENDER_VERSION = {}
+
+
+def refresh_render_cache():
+    """
+    Clears the SVGs cached by _render_svg when the styles or one of the templates
+    was modified since they were rendered, otherwise the cached SVGs would be
+    served with the old styles and markup until the server restarts.
+    """
+    version = tuple(os.stat(path).st_mtime for path in _RENDER_SOURCES)
+    if _RENDER_VERSION.get("sources") != version:
+        _render_svg.cache_clear()
+        _RENDER_VERSION["sources"] = version
+
+
+@lru_cache(maxsize=1024)
+def _render_svg(title, frozen_value, username, colors, card_type):
+    """
+    Renders an SVG, caching the result so repeated requests for the same card
+    with unchanged data and colors skip the template work entirely.
+    Parameters:
+    title (str): The title of the SVG.
+    frozen_value (_FrozenValue): The value to be displayed in the SVG.
+    username (str): The username to be displayed in the SVG.
+    colors (tuple): The colors to be used in the SVG.
+    card_type (str): The type of the card.
+    Returns:
+    str: The generated SVG.
+    """
+    value = frozen_value.value
+    colors = list(colors)
+
+    handler = _DISPATCH.get(title)
+
+    if handler is not None:
+        function_to_execute, extra_args = handler
+        return function_to_execute(value, username, *extra_args, colors, card_type)
+
+    log_message("Invalid title, generating placeholder svg", "debug")
+    return _FALLBACK_SVG.substitute(title=title, value=value)
+
+
 def generate_button(name, y):
     """
     Generates an SVG button with the provided name and y-coordinate.
@@ -95,7 +274,8 @@ def generate_button(name, y):
     Markup: The generated SVG button.
     """
     try:
-        log_message(f"Started generating button for {name}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started generating button for {name}", "debug")
 
         # pylint: disable=C0301
         button_markup = Markup(
@@ -126,9 +306,7 @@ def generate_button(name, y):
 
 
 def generate_base_stats_html(  # pylint: disable=R0913
-    html_path,
-    placeholders,
-    styles_path,
+    template_name,
     css_path,
     dasharray,
     dashoffset,
@@ -142,9 +320,7 @@ def generate_base_stats_html(  # pylint: disable=R0913
     Generate HTML by replacing placeholders in a template with actual values.
 
     Args:
-        html_path (str): The path to the HTML template.
-        placeholders (list): The placeholders to replace in the HTML template.
-        styles_path (str): The path to the styles.
+        template_name (str): The name of the SVG template.
         css_path (str): The path to the CSS file.
         dasharray (str): The 'stroke-dasharray' property for the SVG.
         dashoffset (str): The 'stroke-dashoffset' property for the SVG.
@@ -157,47 +333,26 @@ def generate_base_stats_html(  # pylint: disable=R0913
     Returns:
         str: The generated HTML.
     """
-    # Read the HTML template
-    with open(html_path, "r", encoding="utf-8") as file:
-        html_template = file.read()
+    # Fill in the styles
+    styles = inline_styles(css_path, dasharray, dashoffset, colors)
 
-    log_message(f"HTML template read successfully for {username}", "info")
+    if DEBUG_ENABLED:
+        log_message(f"Styles inlined successfully for {username}", "debug")
 
-    # Escape the curly braces in the HTML template
-    html_template = html_template.replace("{", "{{").replace("}", "}}")
-
-    # Unescape the placeholders that you want to replace
-    for placeholder in placeholders:
-        html_template = html_template.replace(
-            "{{" + placeholder + "}}", "{" + placeholder + "}"
-        )
-
-    # Inline the styles
-    html_template = inline_styles(
-        styles_path,
-        css_path,
-        dasharray,
-        dashoffset,
-        colors,
-    )
-
-    log_message(f"Styles inlined successfully for {username}", "debug")
-
-    # Replace the placeholders in the HTML template with actual values
-    html = html_template.format(
+    # Render the SVG template with the actual values
+    html = SVG_TEMPLATES.get_template(template_name).render(
+        values,
+        styles=styles,
         username=username,
         current_milestone=current_milestone,
         previous_milestone=previous_milestone,
-        **values,
     )
 
     return html
 
 
 def generate_default_base_stats_html(
-    html_path,
-    placeholders,
-    styles_path,
+    template_name,
     dasharray,
     dashoffset,
     colors,
@@ -210,9 +365,7 @@ def generate_default_base_stats_html(
     Generates the default base statistics HTML for a given user.
 
     Parameters:
-    html_path (str): The path to the HTML template.
-    placeholders (list): A list of placeholders to replace in the HTML template.
-    styles_path (str): The path to the styles for the HTML template.
+    template_name (str): The name of the SVG template.
     dasharray (str): The dasharray value for the SVG.
     dashoffset (str): The dashoffset value for the SVG.
     colors (list): A list of color values to be used in the SVG.
@@ -224,13 +377,11 @@ def generate_default_base_stats_html(
     Returns:
     str: The generated HTML as a string, or None if an error occurred.
     """
-    css_path = os.path.join("public", "styles", "SVGs", "DefaultStatsStyles.css")
+    css_path = DEFAULT_STATS_CSS_PATH
 
     # Call the function
     html = generate_base_stats_html(
-        html_path=html_path,
-        placeholders=placeholders,
-        styles_path=styles_path,
+        template_name=template_name,
         css_path=css_path,
         dasharray=dasharray,
         dashoffset=dashoffset,
@@ -260,85 +411,59 @@ def generate_extra_stats_html(
     svg_type (str): The type of SVG to generate.
     stats_type (str): The type of statistics to generate ("Anime" or "Manga").
     Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
+    str: The generated SVG, or None if an error occurred.
     """
     try:
-        log_message(
-            f"Started generating extra {stats_type.lower()} stats svg for {username}",
-            "debug",
-        )
+        if DEBUG_ENABLED:
+            log_message(
+                f"Started generating extra {stats_type.lower()} stats svg for {username}",
+                "debug",
+            )
 
         if svg_type == "Default":
-            # Read the HTML template
-            with open(
-                f"Pages/SVGs/{stats_type.lower()}StatsSVG.html", "r", encoding="utf-8"
-            ) as file:
-                html_template = file.read()
-
-            log_message(f"HTML template read successfully for {username}", "info")
-
-            # Escape the curly braces in the HTML template
-            html_template = html_template.replace("{", "{{").replace("}", "}}")
-
-            # Unescape the placeholders that you want to replace
-            placeholders = [
-                "username",
-                "count",
-                "data1",
-                "data2",
-                "data3",
-                "data4",
-                "data5",
-                "headerStyle",
-            ]
-            for placeholder in placeholders:
-                html_template = html_template.replace(
-                    "{{" + placeholder + "}}", "{" + placeholder + "}"
+            # The name of the statistics shown in the header
+            stats_name = (
+                "Voice Actors"
+                if key == "voiceActor"
+                else (
+                    key.capitalize()
+                    if key.capitalize() == "Staff"
+                    else key.capitalize() + "s"
                 )
-
-            log_message(f"Placeholders replaced successfully for {username}", "debug")
+            )
 
             # Inline the styles and calculate the font size
-            html_template, font_size = inline_styles_and_calculate_font_size(
-                username, colors, key
+            styles, font_size = inline_styles_and_calculate_font_size(
+                username, colors, f"{stats_type} {stats_name}"
             )
 
-            # Generate the CSS rules for the header class
-            header_style = f"""font-weight: 600;
-                        font-family: 'Segoe UI', Ubuntu, Sans-Serif;
-                        fill: #fe428e;
-                        animation: fadeInAnimation 0.8s ease-in-out forwards;
-                        font-size: {font_size}px;"""
-
-            # Replace the placeholders in the HTML template with actual values
-            html = html_template.format(
-                username=username,
-                type=(
-                    "Voice Actors"
-                    if key == "voiceActor"
-                    else (
-                        key.capitalize()
-                        if key.capitalize() == "Staff"
-                        else key.capitalize() + "s"
-                    )
-                ),
-                format=stats_type,
-                key1=value[0][key],
-                data1=value[0]["count"],
-                key2=value[1][key],
-                data2=value[1]["count"],
-                key3=value[2][key],
-                data3=value[2]["count"],
-                key4=value[3][key],
-                data4=value[3]["count"],
-                key5=value[4][key],
-                data5=value[4]["count"],
-                headerStyle=header_style,
+            # Render the SVG template with the actual values
+            html = SVG_TEMPLATES.get_template(EXTRA_STATS_SVG_TEMPLATE).render(
+                {
+                    "username": username,
+                    "type": stats_name,
+                    "format": stats_type,
+                    "key1": value[0][key],
+                    "data1": value[0]["count"],
+                    "key2": value[1][key],
+                    "data2": value[1]["count"],
+                    "key3": value[2][key],
+                    "data3": value[2]["count"],
+                    "key4": value[3][key],
+                    "data4": value[3]["count"],
+                    "key5": value[4][key],
+                    "data5": value[4]["count"],
+                    # Only headers too long for the card are given a smaller size
+                    "headerFontSize": (
+                        font_size if font_size < HEADER_FONT_SIZE else None
+                    ),
+                },
+                styles=styles,
             )
 
             log_message(f"HTML template generated successfully for {username}", "info")
 
-            return Markup(html)
+            return html
         return None
     except Exception as e:
         log_message(
@@ -348,51 +473,73 @@ def generate_extra_stats_html(
         raise e
 
 
-def inline_styles(svg_file, css_file, dasharray, dashoffset, colors):
+# The extra anime and manga SVGs only differ by the stats type shown in the title
+generate_extraAnimeStats_svg = partial(generate_extra_stats_html, stats_type="Anime")
+generate_extraMangaStats_svg = partial(generate_extra_stats_html, stats_type="Manga")
+
+
+# The CSS placeholders that are filled in per SVG, written as %%name%% so they
+# don't clash with the braces of the CSS rules, matched in a single pass
+STYLE_PLACEHOLDER_RE = re.compile(r"%%(\w+)%%")
+
+# The contents of the CSS files by path, along with their modification time
+_STYLES_CACHE = {}
+
+
+def load_styles(css_file):
     """
-    Inlines styles into an SVG file from a CSS file.
+    Reads a CSS file. The contents are cached until the file is modified.
     Parameters:
-    svg_file (str): The path to the SVG file.
     css_file (str): The path to the CSS file.
-    dasharray (int): The dasharray value to be used in the styles.
-    dashoffset (int): The dashoffset value to be used in the styles.
-    colors (list): A list of color values to be used in the styles.
     Returns:
-    str: The SVG file with inlined styles, or None if an error occurred.
+    str: The CSS, with its style placeholders still to be filled in.
     """
     try:
-        log_message("Started inlining styles into svg", "debug")
+        mtime = os.stat(css_file).st_mtime
+        cached = _STYLES_CACHE.get(css_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
 
-        with open(css_file, "r", encoding="utf-8") as f:
-            styles = f.read()
-            styles = styles.replace("{", "{{").replace("}", "}}")
-            styles = styles.replace("{{dasharray}}", str(dasharray)).replace(
-                "{{dashoffset}}", str(dashoffset)
-            )
-            styles = styles.replace("{{title_color}}", colors[0])
-            styles = styles.replace("{{background_color}}", colors[1])
-            styles = styles.replace("{{text_color}}", colors[2])
-            styles = styles.replace("{{circle_color}}", colors[3])
-
-        log_message("Styles read and replaced successfully", "debug")
+        log_message("Started reading styles", "debug")
 
-        with open(svg_file, "r", encoding="utf-8") as f:
-            svg = f.read()
-
-        log_message("SVG file read successfully", "debug")
+        with open(css_file, "r", encoding="utf-8") as f:
+            styles = minify_styles(f.read())
 
-        # Insert the styles into the SVG file inside a <style> tag
-        svg = svg.replace("<defs>", f"<defs><style>{styles}</style>", 1)
+        _STYLES_CACHE[css_file] = (mtime, styles)
 
-        log_message("Styles inlined into SVG successfully", "debug")
+        log_message("Styles read successfully", "debug")
 
-        return svg
+        return styles
 
     except Exception as e:
-        log_message(f"Error occurred inlining styles into SVG: {e}", "error")
+        log_message(f"Error occurred reading styles: {e}", "error")
         raise e
 
 
+def inline_styles(css_file, dasharray, dashoffset, colors):
+    """
+    Fills in the styles to inline into an SVG from a CSS file.
+    Parameters:
+    css_file (str): The path to the CSS file.
+    dasharray (int): The dasharray value to be used in the styles.
+    dashoffset (int): The dashoffset value to be used in the styles.
+    colors (list): A list of color values to be used in the styles.
+    Returns:
+    str: The styles to place inside the <style> tag of the SVG.
+    """
+    style_values = {
+        "dasharray": str(dasharray),
+        "dashoffset": str(dashoffset),
+        "title_color": colors[0],
+        "background_color": colors[1],
+        "text_color": colors[2],
+        "circle_color": colors[3],
+    }
+    return STYLE_PLACEHOLDER_RE.sub(
+        lambda match: style_values[match.group(1)], load_styles(css_file)
+    )
+
+
 def calculate_milestones(value, key):
     """
     Calculate milestones, percentage, circle circumference, dasharray, and
@@ -406,41 +553,27 @@ def calculate_milestones(value, key):
     tuple: A tuple containing previous milestone, current milestone, dasharray,
     and dashoffset.
     """
-    # Initialize milestones list with the first five milestones
-    milestones = [100, 250, 500, 750, 1000]
-
-    # Determine the maximum milestone based on the number of the given key
-    max_milestone = ((value[key] // 1000) + 1) * 1000
-
-    # Generate the rest of the milestones
-    for i in range(1000, max_milestone + 1, 1000):
-        milestones.append(i)
-
-    # Determine the previous milestone based on the number of the given key
-    previous_milestone = max(
-        (milestone for milestone in milestones if milestone < value[key]), default=0
-    )
-
-    # Determine the current milestone based on the number of the given key
-    current_milestone = min(
-        (milestone for milestone in milestones if milestone >= value[key]), default=100
-    )
+    count = value[key]
+
+    if count > MILESTONES[-1]:
+        # Past the first milestones there is one every 1000
+        current_milestone = -(-count // 1000) * 1000
+        previous_milestone = current_milestone - 1000
+    else:
+        # Find the first milestone that hasn't been passed yet
+        index = bisect_left(MILESTONES, count)
+        current_milestone = MILESTONES[index]
+        previous_milestone = MILESTONES[index - 1] if index else 0
 
     # Calculate percentage
     percentage = (
-        (value[key] - previous_milestone) / (current_milestone - previous_milestone)
+        (count - previous_milestone) / (current_milestone - previous_milestone)
     ) * 100
 
-    # Calculate circle circumference
-    circle_circumference = 2 * math.pi * 40
-
-    # Calculate dasharray
-    dasharray = circle_circumference
+    # Calculate dashoffset, the dasharray is the whole circumference
+    dashoffset = CIRCLE_CIRCUMFERENCE * (1 - (percentage / 100))
 
-    # Calculate dashoffset
-    dashoffset = circle_circumference * (1 - (percentage / 100))
-
-    return previous_milestone, current_milestone, dasharray, dashoffset
+    return previous_milestone, current_milestone, CIRCLE_CIRCUMFERENCE, dashoffset
 
 
 def generate_animeStats_svg(value, username, colors, svg_type):
@@ -452,10 +585,11 @@ def generate_animeStats_svg(value, username, colors, svg_type):
     colors (list): A list of color values to be used in the SVG.
     type (str): The type of SVG to generate.
     Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
+    str: The generated SVG, or None if an error occurred.
     """
     try:
-        log_message(f"Started generating anime stats svg for {username}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started generating anime stats svg for {username}", "debug")
 
         if svg_type == "Default":
             (
@@ -465,26 +599,13 @@ def generate_animeStats_svg(value, username, colors, svg_type):
                 dashoffset,
             ) = calculate_milestones(value, "episodesWatched")
 
-            log_message(f"Milestones calculated successfully for {username}", "debug")
-
-            # Define the placeholders
-            placeholders = [
-                "username",
-                "count",
-                "episodesWatched",
-                "minutesWatched",
-                "meanScore",
-                "standardDeviation",
-                "current_milestone",
-            ]
-
-            # Define the paths
-            html_path = "Pages/SVGs/animeStatsSVG.html"
-            styles_path = os.path.join("Pages", "SVGs", "animeStatsSVG.html")
+            if DEBUG_ENABLED:
+                log_message(
+                    f"Milestones calculated successfully for {username}", "debug"
+                )
+
             html = generate_default_base_stats_html(
-                html_path,
-                placeholders,
-                styles_path,
+                "animeStatsSVG.html",
                 dasharray,
                 dashoffset,
                 colors,
@@ -494,7 +615,7 @@ def generate_animeStats_svg(value, username, colors, svg_type):
                 **value,
             )
 
-            return Markup(html)
+            return html
         return None
     except Exception as e:
         log_message(
@@ -505,25 +626,31 @@ def generate_animeStats_svg(value, username, colors, svg_type):
 
 def calculate_font_size(text, initial_font_size, max_width):
     """
-    Generates an SVG representation of anime statistics for a given user.
+    Calculates the largest font size, up to the initial font size, at which the
+    estimated width of a text fits within a maximum width.
     Parameters:
-    value (dict): A dictionary containing the anime statistics for the user.
-    username (str): The username of the user.
-    colors (list): A list of color values to be used in the SVG.
-    type (str): The type of SVG to generate.
+    text (str): The text to fit.
+    initial_font_size (int): The font size to use if the text already fits.
+    max_width (int): The maximum width of the text.
     Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
+    int: The calculated font size, at least 1.
     """
     try:
-        log_message(f"Started calculating font size for text: {text}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started calculating font size for text: {text}", "debug")
 
         scaling_factor = 0.6  # Adjust this value based on your specific font
-        estimated_text_width = len(text) * initial_font_size * scaling_factor
-        while estimated_text_width > max_width:
-            initial_font_size -= 1
-            estimated_text_width = len(text) * initial_font_size * scaling_factor
-
-        log_message(f"Font size calculated successfully for text: {text}", "debug")
+        text_length = len(text)
+        if text_length * initial_font_size * scaling_factor > max_width:
+            # The estimated width grows linearly with the font size,
+            # so the largest font size that fits can be solved for directly
+            font_size = math.floor(max_width / (text_length * scaling_factor))
+            if text_length * font_size * scaling_factor > max_width:
+                font_size -= 1  # Guard against floating point rounding
+            initial_font_size = max(1, font_size)
+
+        if DEBUG_ENABLED:
+            log_message(f"Font size calculated successfully for text: {text}", "debug")
 
         return initial_font_size
 
@@ -534,53 +661,37 @@ def calculate_font_size(text, initial_font_size, max_width):
         raise e
 
 
-def inline_styles_and_calculate_font_size(username, colors, key):
+def inline_styles_and_calculate_font_size(username, colors, stats_title):
     """
     Inline the styles and calculate the font size for the SVG.
 
     Parameters:
     username (str): The username of the user.
     colors (list): A list of color values to be used in the SVG.
-    key (str): The key to be used in the statistics.
+    stats_title (str): The statistics shown in the header, e.g. "Anime Genres".
 
     Returns:
-    tuple: A tuple containing the HTML template with inlined styles and the calculated font size.
+    tuple: A tuple containing the styles to inline and the calculated font size.
     """
     # Inline the styles
-    html_template = inline_styles(
-        os.path.join("Pages", "SVGs", "extraAnime&MangaStatsSVG.html"),
-        os.path.join("public", "styles", "SVGs", "DefaultStatsStyles.css"),
+    styles = inline_styles(
+        DEFAULT_STATS_CSS_PATH,
         0,  # dasharray is not used in this SVG
         0,  # dashoffset is not used in this SVG
         colors,
     )
 
-    log_message(f"Styles inlined successfully for {username}", "debug")
+    if DEBUG_ENABLED:
+        log_message(f"Styles inlined successfully for {username}", "debug")
 
     # Calculate the font size
-    text = f"{username}'s Top Manga {key.capitalize()}s"
-    initial_font_size = 18
-    max_width = 320
-    font_size = calculate_font_size(text, initial_font_size, max_width)
+    text = f"{username}'s Top {stats_title}"
+    font_size = calculate_font_size(text, HEADER_FONT_SIZE, HEADER_MAX_WIDTH)
 
-    log_message(f"Font size calculated successfully for {username}", "debug")
+    if DEBUG_ENABLED:
+        log_message(f"Font size calculated successfully for {username}", "debug")
 
-    return html_template, font_size
-
-
-def generate_extraAnimeStats_svg(value, username, key, colors, svg_type):
-    """
-    Generates an SVG representation of extra anime statistics for a given user.
-    Parameters:
-    value (list): A list of dictionaries containing the extra anime statistics for the user.
-    username (str): The username of the user.
-    key (str): The key to be used in the statistics.
-    colors (list): A list of color values to be used in the SVG.
-    type (str): The type of SVG to generate.
-    Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
-    """
-    return generate_extra_stats_html(value, username, key, colors, svg_type, "Anime")
+    return styles, font_size
 
 
 def generate_mangaStats_svg(value, username, colors, svg_type):
@@ -592,10 +703,11 @@ def generate_mangaStats_svg(value, username, colors, svg_type):
     colors (list): A list of color values to be used in the SVG.
     svg_type (str): The type of SVG to generate.
     Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
+    str: The generated SVG, or None if an error occurred.
     """
     try:
-        log_message(f"Started generating manga stats svg for {username}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started generating manga stats svg for {username}", "debug")
 
         if svg_type == "Default":
             (
@@ -605,26 +717,13 @@ def generate_mangaStats_svg(value, username, colors, svg_type):
                 dashoffset,
             ) = calculate_milestones(value, "chaptersRead")
 
-            log_message(f"Milestones calculated successfully for {username}", "debug")
-
-            # Define the placeholders
-            placeholders = [
-                "username",
-                "count",
-                "chaptersRead",
-                "volumesRead",
-                "meanScore",
-                "standardDeviation",
-                "current_milestone",
-            ]
-
-            # Define the paths
-            html_path = "Pages/SVGs/mangaStatsSVG.html"
-            styles_path = os.path.join("Pages", "SVGs", "mangaStatsSVG.html")
+            if DEBUG_ENABLED:
+                log_message(
+                    f"Milestones calculated successfully for {username}", "debug"
+                )
+
             html = generate_default_base_stats_html(
-                html_path,
-                placeholders,
-                styles_path,
+                "mangaStatsSVG.html",
                 dasharray,
                 dashoffset,
                 colors,
@@ -634,7 +733,7 @@ def generate_mangaStats_svg(value, username, colors, svg_type):
                 **value,
             )
 
-            return Markup(html)
+            return html
         return None
 
     except Exception as e:
@@ -644,21 +743,6 @@ def generate_mangaStats_svg(value, username, colors, svg_type):
         raise e
 
 
-def generate_extraMangaStats_svg(value, username, key, colors, svg_type):
-    """
-    Generates an SVG representation of extra manga statistics for a given user.
-    Parameters:
-    value (list): A list of dictionaries containing the extra manga statistics for the user.
-    username (str): The username of the user.
-    key (str): The key to be used in the statistics.
-    colors (list): A list of color values to be used in the SVG.
-    type (str): The type of SVG to generate.
-    Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
-    """
-    return generate_extra_stats_html(value, username, key, colors, svg_type, "Manga")
-
-
 def generate_socialStats_svg(value, username, colors, svg_type):
     """
     Generates an SVG representation of social statistics for a given user.
@@ -668,55 +752,55 @@ def generate_socialStats_svg(value, username, colors, svg_type):
     colors (list): A list of color values to be used in the SVG.
     type (str): The type of SVG to generate.
     Returns:
-    Markup: The generated SVG as a Markup object, or None if an error occurred.
+    str: The generated SVG, or None if an error occurred.
     """
     try:
-        log_message(f"Started generating social stats svg for {username}", "debug")
+        if DEBUG_ENABLED:
+            log_message(f"Started generating social stats svg for {username}", "debug")
 
         if svg_type == "Default":
-            # Read the HTML template
-            with open("Pages/SVGs/socialStatsSVG.html", "r", encoding="utf-8") as file:
-                html_template = file.read()
-
-            log_message(f"HTML template read successfully for {username}", "info")
-
-            # Escape the curly braces in the HTML template
-            html_template = html_template.replace("{", "{{").replace("}", "}}")
-
-            # Unescape the placeholders that you want to replace
-            placeholders = [
-                "username",
-                "totalFollowers",
-                "totalFollowing",
-                "totalActivity",
-            ]
-            for placeholder in placeholders:
-                html_template = html_template.replace(
-                    "{{" + placeholder + "}}", "{" + placeholder + "}"
-                )
-
-            log_message(f"Placeholders replaced successfully for {username}", "debug")
-
             # Inline the styles
-            html_template = inline_styles(
-                os.path.join("Pages", "SVGs", "socialStatsSVG.html"),
-                os.path.join("public", "styles", "SVGs", "DefaultStatsStyles.css"),
+            styles = inline_styles(
+                DEFAULT_STATS_CSS_PATH,
                 0,  # dasharray is not used in this SVG
                 0,  # dashoffset is not used in this SVG
                 colors,
             )
 
-            log_message(f"Styles inlined successfully for {username}", "debug")
+            if DEBUG_ENABLED:
+                log_message(f"Styles inlined successfully for {username}", "debug")
 
-            # Replace the placeholders in the HTML template with actual values
-            html = html_template.format(username=username, **value)
+            # Render the SVG template with the actual values
+            html = SVG_TEMPLATES.get_template("socialStatsSVG.html").render(
+                value, styles=styles, username=username
+            )
 
             log_message(f"HTML template generated successfully for {username}", "info")
 
-            return Markup(html)
+            return html
         return None
     except Exception as e:
         log_message(
             f"Error occurred generating social stats svg for {username}: {e}", "error"
         )
         raise e
+
+
+# The generator of each SVG title, along with the extra arguments it's called with
+_DISPATCH = {
+    "animeStats": (generate_animeStats_svg, ()),
+    "mangaStats": (generate_mangaStats_svg, ()),
+    "socialStats": (generate_socialStats_svg, ()),
+    "animeGenres": (generate_extraAnimeStats_svg, ("genre",)),
+    "animeTags": (generate_extraAnimeStats_svg, ("tag",)),
+    "animeVoiceActors": (generate_extraAnimeStats_svg, ("voiceActor",)),
+    "animeStudios": (generate_extraAnimeStats_svg, ("studio",)),
+    "animeStaff": (generate_extraAnimeStats_svg, ("staff",)),
+    "mangaGenres": (generate_extraMangaStats_svg, ("genre",)),
+    "mangaTags": (generate_extraMangaStats_svg, ("tag",)),
+    "mangaStaff": (generate_extraMangaStats_svg, ("staff",)),
+}
+
+
+# Load the styles and templates when the server starts rather than on the first request
+preload_templates()
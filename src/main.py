@@ -10,16 +10,20 @@ This module is the main entry point for the AniCards application.
 # TODO: Add the colors used to generate the svg to the individual statcard tables
 
 # Standard library imports
+import gzip
+import hashlib
 import os
+import re
+import sqlite3
 import subprocess
 import time
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Related third party imports
 from typing import Dict, List
 from urllib.parse import ParseResult, urlparse, urlunparse
 
-import schedule
 from flask import (
     Flask,
     abort,
@@ -49,9 +53,18 @@ from Program.Database.models import (
     StatCard,
     User,
 )
-from Program.generateSVGs import generate_svg
-from Program.Utils.logger import log_message
+from Program.generateSVGs import generate_all_svgs
+from Program.Utils.cache import TTLCache
+from Program.Utils.logger import DEBUG_ENABLED, log_message
+from Program.Utils.rate_limit import RateLimiter
+from sqlalchemy import bindparam, case, delete, event, select  # pylint: disable=C0411
+from sqlalchemy.dialects.postgresql import (  # pylint: disable=C0411
+    insert as postgresql_insert,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # pylint: disable=C0411
+from sqlalchemy.engine import Engine  # pylint: disable=C0411
 from sqlalchemy.exc import OperationalError  # pylint: disable=C0411
+from werkzeug.exceptions import HTTPException  # pylint: disable=C0411
 
 # Use the imported modules
 fetch_anilist_data = AniListData.fetch_anilist_data
@@ -61,6 +74,20 @@ db = database.db
 # Initialize Flask app
 app = Flask(__name__, static_folder="public", template_folder="Pages")
 
+# Compile the page templates when the server starts instead of on the first request
+# to each page. Outside of debug mode Flask doesn't check them for changes anymore
+if not app.debug:
+    for page_template in (
+        "user_template.html",
+        "aniCards.html",
+        "statCards.html",
+        "badges.html",
+        "faq.html",
+        "error.html",
+        "templates/base.html",
+    ):
+        app.jinja_env.get_template(page_template)
+
 # Get the DATABASE_URL environment variable
 database_url = os.getenv("DATABASE_URL")
 
@@ -75,10 +102,61 @@ if database_url:
 
 # Configure SQLAlchemy with the database URL
 app.config["SQLALCHEMY_DATABASE_URI"] = database_url or "sqlite:///test.db"
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    # Room for the compiled statements of every route and model
+    "query_cache_size": 1200,
+    # Replace connections the database closed while they were idle in the pool
+    "pool_pre_ping": True,
+    # Enough connections for the server threads, with room to burst
+    "pool_size": 10,
+    "max_overflow": 20,
+    # Heroku closes idle Postgres connections, recycle them before that happens
+    "pool_recycle": 280,
+    # Reuse the most recently used connection so the others can go idle
+    "pool_use_lifo": True,
+}
+if not database_url:
+    # SQLite has no schemas, the local database keeps the tables of the svg schema
+    # in its main database
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"]["execution_options"] = {
+        "schema_translate_map": {"svg": None}
+    }
 db.init_app(app)
 
+
+if not database_url:
+
+    @event.listens_for(Engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _connection_record):
+        """
+        Put the local SQLite database in WAL mode on every new connection.
+
+        WAL lets the SVG routes keep reading while generate_svgs is writing,
+        instead of readers and the writer blocking each other.
+
+        Parameters:
+        dbapi_connection (sqlite3.Connection): The new DBAPI connection.
+        _connection_record (ConnectionRecord): Its pool record (unused).
+        """
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+
 app.config["PREFERRED_URL_SCHEME"] = "https"
 
+# The generate form only sends a few keys and colors, larger requests are rejected
+# before their body is parsed
+app.config["MAX_CONTENT_LENGTH"] = 16 * 1024
+
+# A color sent by the generate form, with or without its '#'
+HEX_COLOR_RE = re.compile(r"#?([0-9a-fA-F]{6})")
+
 key_types: Dict[str, List] = {
     "animeStats": [],
     "socialStats": [],
@@ -108,43 +186,324 @@ key_to_class = {
     "mangaStaff": MangaStaff,
 }
 
+# The position of each key in the order the cards are generated and displayed in
+KEY_ORDER = {key: index for index, key in enumerate(key_to_class)}
+
+# Define a dictionary that maps the keys sent by the form to the keys of the SVGs
+key_mapping = {
+    "animeStatsCheckbox": "animeStats",
+    "mangaStatsCheckbox": "mangaStats",
+    "socialStatsCheckbox": "socialStats",
+}
+
 
-def get_record(key, user_id):
+def sort_keys(keys):
     """
-    Fetches the record associated with the given key and user_id from the database.
+    Sorts the keys in place by their position in KEY_ORDER, keys that aren't in
+    it are put last.
 
     Parameters:
-    key (str): The key associated with the record.
-    user_id (int): The ID of the user.
+    keys (list): The keys to sort.
+    """
+    keys.sort(key=lambda key: KEY_ORDER.get(key, len(KEY_ORDER)))
+
+
+# Selects built once at import, so each request only binds its parameters to them
+select_user_by_username = (
+    select(User).where(User.username == bindparam("username")).limit(1)
+)
+select_user_by_userid = select(User).where(User.userid == bindparam("userid")).limit(1)
+# The user joined with their StatCard, the StatCard is None if the user has none
+select_user_statcard = (
+    select(User.id, StatCard)
+    .outerjoin(StatCard, StatCard.user_id == User.userid)
+    .where(User.username == bindparam("username"))
+    .limit(1)
+)
+# The username, AniList ID and keys of every user that has a StatCard
+select_users_with_statcards = (
+    select(User.username, User.userid, StatCard.keys)
+    .join(StatCard, StatCard.user_id == User.userid)
+    .order_by(User.id)
+)
+
+
+def svg_columns(record_class):
+    """
+    Returns the columns to select to load the SVG of the given table. The SVG is
+    only selected when there is no gzipped copy of it, otherwise it is decompressed
+    from that copy so the database sends several times less data.
+
+    Parameters:
+    record_class (Model): The model of the table the SVG is stored in.
 
     Returns:
-    Record: The record associated with the key and user_id, or None if no such record exists.
-    """
-
-    # Map keys to query functions
-    key_to_query = {
-        "animeStats": AnimeStats.query,
-        "socialStats": SocialStats.query,
-        "mangaStats": MangaStats.query,
-        "animeGenres": AnimeGenres.query,
-        "animeTags": AnimeTags.query,
-        "animeVoiceActors": AnimeVoiceActors.query,
-        "animeStudios": AnimeStudios.query,
-        "animeStaff": AnimeStaff.query,
-        "mangaGenres": MangaGenres.query,
-        "mangaTags": MangaTags.query,
-        "mangaStaff": MangaStaff.query,
+    tuple: The SVG data column, None when the gzipped copy is stored, and the
+    gzipped SVG data column.
+    """
+    return (
+        case((record_class.data_gz.is_(None), record_class.data)),
+        record_class.data_gz,
+    )
+
+
+# The user joined with the columns of their SVG of each key, they are None if the
+# user has no SVG. Only the columns are selected so no record objects are built
+select_user_record = {
+    key: select(User.id, *svg_columns(record_class))
+    .outerjoin(record_class, record_class.user_id == User.userid)
+    .where(User.username == bindparam("username"))
+    .limit(1)
+    for key, record_class in key_to_class.items()
+}
+# The columns of the SVGs of every key of a user in one row, they are None for
+# the keys the user has no SVG for
+select_user_records = (
+    select(
+        *[
+            column
+            for record_class in key_to_class.values()
+            for column in svg_columns(record_class)
+        ]
+    )
+    .select_from(User)
+    .where(User.username == bindparam("username"))
+    .limit(1)
+)
+for record_class in key_to_class.values():
+    select_user_records = select_user_records.outerjoin(
+        record_class, record_class.user_id == User.userid
+    )
+
+
+def fetch_first(statement, **params):
+    """
+    Executes one of the prebuilt selects and returns the first object it finds.
+
+    Parameters:
+    statement (Select): The select to execute.
+    **params: The values of the bound parameters of the select.
+
+    Returns:
+    Model: The first object found, or None if there is none.
+    """
+    return db.session.execute(statement, params).scalar()
+
+
+# The INSERT ... ON CONFLICT constructs of the supported databases
+dialect_inserts = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def upsert_statcard(user_id):
+    """
+    Fetches the StatCard of the user, creating it first if it doesn't exist,
+    in a single INSERT ... ON CONFLICT ... RETURNING statement.
+
+    Parameters:
+    user_id (int): The AniList ID of the user.
+
+    Returns:
+    StatCard: The StatCard of the user.
+    """
+    insert = dialect_inserts[db.engine.dialect.name]
+    statement = (
+        insert(StatCard)
+        .values(user_id=user_id, keys="")
+        .on_conflict_do_update(
+            index_elements=[StatCard.user_id], set_={"user_id": user_id}
+        )
+        .returning(StatCard)
+    )
+    return db.session.scalars(statement).one()
+
+
+def upsert_record(record_class, user_id, svg_data):
+    """
+    Saves the SVG of the user in the given table, replacing the SVG already
+    stored there, in a single INSERT ... ON CONFLICT statement.
+
+    Parameters:
+    record_class (Model): The model of the table the SVG is stored in.
+    user_id (int): The AniList ID of the user.
+    svg_data (str): The SVG data.
+    """
+    insert = dialect_inserts[db.engine.dialect.name]
+    statement = insert(record_class).values(
+        user_id=user_id, data=svg_data, data_gz=compress_svg(svg_data)
+    )
+    # Update from the excluded row so the SVG is only sent to the database once
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[record_class.user_id],
+            set_={
+                "data": statement.excluded.data,
+                "data_gz": statement.excluded.data_gz,
+            },
+        )
+    )
+
+
+# The rendered user pages, by (username, URL) since the page links to its own URL
+page_cache = TTLCache(maxsize=512, ttl=60)
+
+
+def compress_svg(svg_data):
+    """
+    Gzips an SVG once so it can be served compressed without compressing it
+    again for every request.
+
+    Parameters:
+    svg_data (str): The SVG data.
+
+    Returns:
+    bytes: The gzipped SVG data.
+    """
+    return gzip.compress(svg_data.encode("utf-8"), compresslevel=6)
+
+
+# The SVGs served by the get_svg routes, by (username, key). generate_svgs drops
+# the SVGs it rewrites from here, but the regenerate-svgs command rewrites them
+# from its own process, so nothing tells the server about those. The .svg route
+# serves entries for up to an hour, as long as its clients keep the SVGs anyway,
+# while the user page only trusts entries from the last minute
+svg_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# How old a cached SVG may be to be shown on the user page, in seconds
+PAGE_SVG_MAX_AGE = 60
+
+
+def load_svg(username, key, max_age=None):
+    """
+    Fetches the SVG associated with the given username and key, from the cache
+    if it was fetched recently and from the database otherwise.
+
+    Parameters:
+    username (str): The username of the user.
+    key (str): The key associated with the SVG.
+    max_age (int, optional): How old the cached SVG may be, in seconds. Defaults
+    to the lifetime of the cache.
+
+    Returns:
+    tuple: The SVG data, its gzipped copy and its ETag.
+
+    Raises:
+    NotFound: If the user or the SVG is not found.
+    """
+    svg = svg_cache.get((username, key), max_age=max_age)
+    if svg is None:
+        # Fetch the User and the data from the respective table in one query
+        statement = select_user_record.get(key)
+        if statement is None:
+            abort(404, description="SVG not found")
+        row = db.session.execute(statement, {"username": username}).first()
+        if row is None:
+            abort(404, description="User not found")
+
+        _, svg_data, svg_data_gz = row
+        if not svg_data and not svg_data_gz:
+            abort(404, description="SVG not found")
+
+        svg = cache_svg(username, key, svg_data, svg_data_gz)
+    return svg
+
+
+def cache_svg(username, key, svg_data, svg_data_gz):
+    """
+    Caches an SVG fetched from the database together with its gzipped copy and
+    its ETag.
+
+    Parameters:
+    username (str): The username of the user.
+    key (str): The key associated with the SVG.
+    svg_data (str): The SVG data, None if it wasn't selected.
+    svg_data_gz (bytes): The gzipped SVG data, None if it wasn't stored.
+
+    Returns:
+    tuple: The SVG data, its gzipped copy and its ETag.
+    """
+    if svg_data is None:
+        svg_data = gzip.decompress(svg_data_gz).decode("utf-8")
+    # SVGs stored before the gzipped copy was added are compressed here
+    svg = (
+        svg_data,
+        svg_data_gz or compress_svg(svg_data),
+        hashlib.blake2b(svg_data.encode("utf-8"), digest_size=16).hexdigest(),
+    )
+    svg_cache.set((username, key), svg)
+    return svg
+
+
+def cache_user_svgs(username, keys):
+    """
+    Caches the SVGs of the given keys that aren't cached recently enough for the
+    user page, fetching all of them in one query. The page of a user requests each
+    of their SVGs right after it loads, so they are then served without a query
+    each.
+
+    Parameters:
+    username (str): The username of the user.
+    keys (list): The keys of the SVGs to cache.
+    """
+    missing_keys = {
+        key
+        for key in keys
+        if svg_cache.get((username, key), max_age=PAGE_SVG_MAX_AGE) is None
     }
+    if not missing_keys:
+        return
+
+    row = db.session.execute(select_user_records, {"username": username}).first()
+    if row is None:
+        return
 
-    # Get the query function for the given key
-    query = key_to_query.get(key)
+    for index, key in enumerate(key_to_class):
+        svg_data, svg_data_gz = row[2 * index], row[2 * index + 1]
+        if key in missing_keys and (svg_data or svg_data_gz):
+            cache_svg(username, key, svg_data, svg_data_gz)
 
-    # If the key is valid, execute the query and return the result
-    if query is not None:
-        return query.filter_by(user_id=user_id).first()
 
-    # If the key is not valid, return None
-    return None
+def make_svg_response(username, key, max_age=None):
+    """
+    Creates a response with the SVG associated with the given username and key,
+    gzipped if the client accepts it.
+
+    Parameters:
+    username (str): The username of the user.
+    key (str): The key associated with the SVG.
+    max_age (int, optional): How old the cached SVG may be, in seconds.
+
+    Returns:
+    Response: A response containing the SVG data, or an empty 304 response if
+    the client already has the same SVG.
+    """
+    svg_data, svg_data_gz, etag = load_svg(username, key, max_age)
+    if request.accept_encodings["gzip"]:
+        response = make_response(svg_data_gz)
+        response.headers["Content-Encoding"] = "gzip"
+        etag += "-gzip"
+    else:
+        response = make_response(svg_data)
+    response.headers["Content-Type"] = "image/svg+xml"
+    response.headers["Vary"] = "Accept-Encoding"
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def delete_user(user):
+    """
+    Deletes the user with their StatCard and SVGs.
+
+    Parameters:
+    user (User): The user to delete.
+    """
+    for record_class in key_to_class.values():
+        db.session.execute(
+            delete(record_class).where(record_class.user_id == user.userid)
+        )
+    db.session.execute(delete(StatCard).where(StatCard.user_id == user.userid))
+    db.session.delete(user)
+    # Deleted now, so the username is free before it is given to another user
+    db.session.flush()
 
 
 # Route for generating SVGs for a user
@@ -162,74 +521,71 @@ def generate_svgs(username):
     Raises:
     Exception: If an error occurs while generating the SVGs or storing them in the database.
     """
-
-    # Define a dictionary that maps the new keys to the old keys
-    key_mapping = {
-        "animeStatsCheckbox": "animeStats",
-        "mangaStatsCheckbox": "mangaStats",
-        "socialStatsCheckbox": "socialStats",
-    }
-
     try:
-        # Fetch the user by username
-        user = User.query.filter_by(username=username).first()
+        # Fetch the userid of the username from AniList on every generation, the
+        # stored one is stale once the username is renamed or given to another
+        # account. Only the scheduled regeneration trusts the stored userid
+        userid = fetch_user_id(username)
+        user = fetch_first(select_user_by_userid, userid=userid)
+        stale_user = fetch_first(select_user_by_username, username=username)
+        if stale_user is not None and stale_user is not user:
+            # The username was stored for another AniList account, whose cards
+            # would otherwise be mixed with the ones of this account
+            delete_user(stale_user)
         if not user:
-            # If the user doesn't exist, fetch the userid
-            userid = fetch_user_id(username)
-            if userid is not None:
-                # Try to fetch the user using the userid
-                user = User.query.filter_by(userid=userid).first()
-                if not user:
-                    # If the user still doesn't exist, create new user with the username and userid
-                    user = User(username=username, userid=userid)
-                    db.session.add(user)
-                else:
-                    # If a user with the given userid exists, update the username
-                    user.username = username
-                db.session.commit()
+            # If the user doesn't exist, create new user with the username and userid
+            user = User(username=username, userid=userid)
+            db.session.add(user)
+        else:
+            # If a user with the given userid exists, update the username
+            user.username = username
+        db.session.flush()
 
         log_message(f"Generating SVGs for user: {username}")
-        # Get keys from the form data
+        # Get keys from the form data, keeping each known key once
         keys = request.form.getlist("keys")  # Get list of keys
         keys = [key_mapping.get(key, key) for key in keys]  # Replace keys
+        keys = [key for key in dict.fromkeys(keys) if key in key_to_class]
 
         # Get colors from the form data
         colors = request.form.getlist("colors")  # Get list of colors
-        colors = [
-            color.lstrip("#") for color in colors
-        ]  # Remove '#' from the start of each color
 
         # If no colors were selected, use default colors
         if not colors or len(colors) != 4:
             colors = ["fe428e", "141321", "a9fef7", "fe428e"]
         else:
             default_colors = ["fe428e", "141321", "a9fef7", "fe428e"]
+            # Colors that aren't hex colors are replaced too, since they end up
+            # in the styles of the SVGs. The '#' is removed from the start of each
+            matches = [HEX_COLOR_RE.fullmatch(color) for color in colors]
             colors = [
-                color if color != "000000" else default
-                for color, default in zip(colors, default_colors)
+                (match.group(1) if match and match.group(1) != "000000" else default)
+                for match, default in zip(matches, default_colors)
             ]
 
-        # Fetch the StatCard for the user from the database
-        statcard = StatCard.query.filter_by(user_id=user.userid).first()
-
-        if not statcard:
-            # If the StatCard doesn't exist, create a new one
-            statcard = StatCard(user_id=user.userid)
-            db.session.add(statcard)
-            db.session.commit()
+        # Fetch the StatCard for the user, it is created if it doesn't exist
+        statcard = upsert_statcard(user.userid)
 
         successful_keys = process_keys_and_generate_svgs(
-            username=username, keys=keys, colors=colors
+            username=username, keys=keys, colors=colors, user=user
         )
 
         # Update the keys in the StatCard
-        existing_keys = statcard.keys.split(",") if statcard.keys else []
-        new_keys = [key for key in successful_keys if key not in existing_keys]
-        all_keys = existing_keys + new_keys
-        keys_string = ",".join(all_keys)
-        statcard.keys = keys_string
+        existing_keys = statcard.key_list
+        known_keys = set(existing_keys)
+        statcard.key_list = existing_keys + [
+            key for key in successful_keys if key not in known_keys
+        ]
 
+        # Commit the user, the StatCard and the SVGs together in one transaction
         db.session.commit()
+
+        # Serve the new SVGs from now on, and none of the stale user's SVGs
+        for key in key_to_class if stale_user is not None else successful_keys:
+            svg_cache.pop((username, key))
+
+        # The user's page may list new keys, and it is cached once per URL
+        page_cache.pop_where(lambda key: key[0] == username)
         log_message("SVGs generated and stored in the database")
 
         return redirect(url_for("display_svgs", username=username))
@@ -249,7 +605,7 @@ def generate_svgs(username):
             "error",
         )
         # Return a response indicating an error occurred
-        raise e
+        raise
 
 
 @app.route("/StatCards/<username>", methods=["GET"])
@@ -268,57 +624,45 @@ def display_svgs(username):
     Exception: If an error occurs while fetching the SVGs from the database or rendering the HTML.
     """
     try:
-        # Fetch the User for the username from the database
-        user = User.query.filter_by(username=username).first()
+        # Serve the page rendered for a recent request if there is one
+        page = page_cache.get((username, request.url))
+        if page is not None:
+            return page
 
-        if not user:
+        # Fetch the User and their StatCard from the database in one query
+        row = db.session.execute(select_user_statcard, {"username": username}).first()
+
+        if row is None:
             abort(404, description="User not found")
 
-        # Fetch the StatCard for the user from the database
-        statcard = StatCard.query.filter_by(user_id=user.userid).first()
+        statcard = row[1]
 
         if not statcard:
             abort(404, description="No SVGs found for this user")
 
         log_message(f"Fetching SVGs ({statcard.keys}) for user: {username}")
         # Extract the keys from the StatCard
-        keys = statcard.keys.split(",")
-
-        # Define custom order
-        custom_order = [
-            "animeStats",
-            "socialStats",
-            "mangaStats",
-            "animeGenres",
-            "animeTags",
-            "animeVoiceActors",
-            "animeStudios",
-            "animeStaff",
-            "mangaGenres",
-            "mangaTags",
-            "mangaStaff",
-        ]
+        keys = statcard.key_list
 
-        # Sort keys according to custom order
-        keys.sort(
-            key=lambda x: (
-                custom_order.index(x) if x in custom_order else len(custom_order)
-            )
-        )
+        # Sort keys according to the key order
+        sort_keys(keys)
 
-        # Fetch the data from the respective tables and generate the svg_types dictionary
-        svg_types = {}
-        for key in keys:
-            svg_types[key] = key_types.get(key, [])
+        # Fetch the SVGs the page is about to request in one query
+        cache_user_svgs(username, keys)
+
+        # Generate the svg_types dictionary
+        svg_types = {key: key_types.get(key, []) for key in keys}
 
         # Render the HTML template
-        return render_template(
+        page = render_template(
             "user_template.html",
             username=username,
             svgs=svg_types,
             keys=keys,
             svg_types=svg_types,
         )
+        page_cache.set((username, request.url), page)
+        return page
 
     except Exception as e:
         log_message(
@@ -326,7 +670,7 @@ def display_svgs(username):
             "error",
         )
         # Return a response indicating an error occurred
-        raise e
+        raise
 
 
 @app.route("/StatCards/get_svg/<username>/<key>", methods=["GET"])
@@ -345,25 +689,17 @@ def get_svg(username, key):
     Exception: If an error occurs while fetching the SVG from the database.
     """
     try:
-        log_message(f"Fetching SVG for user: {username}, key: {key}", "debug")
-        # Fetch the User for the username from the database
-        user = User.query.filter_by(username=username).first()
-        if user:
-            # Fetch the data from the respective table
-            record = get_record(key, user.userid)
-            if record and record.data:
-                response = make_response(record.data)
-                response.headers["Content-Type"] = "image/svg+xml"
-                return response
-            return abort(404, description="SVG not found")
-        return abort(404, description="User not found")
+        if DEBUG_ENABLED:
+            log_message(f"Fetching SVG for user: {username}, key: {key}", "debug")
+        # The page has to show regenerated SVGs, so only recent entries are used
+        return make_svg_response(username, key, PAGE_SVG_MAX_AGE)
     except Exception as e:
         log_message(
             f"An error occurred while fetching SVG for user: {username}, key: {key}. Error: {e}",
             "error",
         )
         # Return a response indicating an error occurred
-        raise e
+        raise
 
 
 @app.route("/StatCards/<username>/<key>.svg")
@@ -382,31 +718,21 @@ def get_svg_from_db(username, key):
     Exception: If an error occurs while fetching the SVG from the database.
     """
     try:
-        log_message(f"Fetching SVG from database for user: {username}, key: {key}")
-        # Fetch the User for the username from the database
-        user = User.query.filter_by(username=username).first()
-        if user:
-            # Fetch the data from the respective table
-            record = get_record(key, user.userid)
-            if record and record.data:
-                # Create a response with the SVG data and the correct content type
-                response = make_response(record.data)
-                response.headers["Content-Type"] = "image/svg+xml"
-
-                # fmt: off
-                # Add cache control headers
-                response.headers["Cache-Control"] = (
-                    "no-cache, must-revalidate, max-age=0"
-                )
-                # fmt: on
-                response.headers["Pragma"] = "no-cache"
-                response.headers["Expires"] = "0"
-
-                return response
+        if DEBUG_ENABLED:
+            log_message(
+                f"Fetching SVG from database for user: {username}, key: {key}",
+                "debug",
+            )
+        # Create a response with the SVG data and the correct content type
+        response = make_svg_response(username, key)
 
-            return abort(404, description="SVG not found")
+        # Let clients and proxies like GitHub's camo reuse the SVG for an hour,
+        # then revalidate it with its ETag
+        response.headers["Cache-Control"] = (
+            "public, max-age=3600, stale-while-revalidate=300"
+        )
 
-        return abort(404, description="User not found")
+        return response
     except Exception as e:
         log_message(
             f"An error occurred while fetching SVG from database for user: "
@@ -414,7 +740,22 @@ def get_svg_from_db(username, key):
             "error",
         )
         # Return a response indicating an error occurred
-        raise e
+        raise
+
+
+@lru_cache(maxsize=None)
+def render_static_page(template):
+    """
+    Renders a page that doesn't depend on the request. The page only changes when
+    the server is updated, so it is rendered once and reused for every request.
+
+    Parameters:
+    template (str): The name of the template of the page.
+
+    Returns:
+    str: The rendered page.
+    """
+    return render_template(template)
 
 
 # StatCards route
@@ -423,7 +764,7 @@ def get_svg_from_db(username, key):
 def stat_cards():
     """Handles requests for the StatCards route."""
     log_message("Accessing StatCards route", "info")
-    return render_template("statCards.html")
+    return render_static_page("statCards.html")
 
 
 @app.route("/Badges")
@@ -431,21 +772,21 @@ def stat_cards():
 def badges():
     """Handles requests for the Badges route."""
     log_message("Accessing Badges route", "info")
-    return render_template("badges.html")
+    return render_static_page("badges.html")
 
 
 @app.route("/faq")
 def faq():
     """Handles requests for the FAQ route."""
     log_message("Accessing FAQ route", "info")
-    return render_template("faq.html")
+    return render_static_page("faq.html")
 
 
 @app.route("/")
 def home():
     """Handles requests for the Home route."""
     log_message("Accessing Home route", "info")
-    return render_template("aniCards.html")
+    return render_static_page("aniCards.html")
 
 
 @app.route("/robots.txt")
@@ -458,17 +799,70 @@ def static_from_root():
 @app.errorhandler(Exception)
 def handle_error(e):
     """Handles any exceptions that occur during request handling."""
+    # Keep the status of HTTP errors like 404, so they aren't reported as server errors
+    if isinstance(e, HTTPException):
+        return render_template("error.html", error=e.description), e.code
     return render_template("error.html", error=str(e)), 500
 
 
-# Create the database for local testing if it doesn't exist
-if not os.path.exists("instance/test.db") and not database_url:
+# Pages smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 500
+
+
+@app.after_request
+def compress_page(response):
+    """
+    Gzips the HTML pages for the clients that accept it. The SVGs are already
+    served from their gzipped copy and the static files are sent as they are.
+
+    Parameters:
+    response (Response): The response to the request.
+
+    Returns:
+    Response: The response, gzipped if it is an HTML page.
+    """
+    if (
+        response.mimetype != "text/html"
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not request.accept_encodings["gzip"]
+    ):
+        return response
+
+    page = response.get_data()
+    if len(page) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.set_data(gzip.compress(page, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def create_tables():
+    """
+    Creates the database tables that don't exist yet.
+    """
+    log_message("Creating database tables", "info")
+    db.create_all()
+
+
+@app.cli.command("init-db")
+def init_db():
+    """
+    Creates the database tables, run with `flask --app main init-db`.
+    """
+    create_tables()
+
+
+# Create the database for local testing the first time the app runs, this only
+# checks whether the file exists instead of checking every table on each start
+if not database_url and not os.path.exists(os.path.join(app.instance_path, "test.db")):
     with app.app_context():
-        log_message("Creating database for local testing", "debug")
-        db.create_all()
+        create_tables()
 
 
-def process_keys_and_generate_svgs(username, keys, colors):
+def process_keys_and_generate_svgs(username, keys, colors, user):
     """
     Process the provided keys,
     fetch the corresponding data,
@@ -479,45 +873,27 @@ def process_keys_and_generate_svgs(username, keys, colors):
     username (str): The username of the user.
     keys (list): The keys to process.
     colors (dict): The colors to use in the SVGs.
+    user (User): The user, with the userid generate_svgs fetched from AniList.
 
     Returns:
     list: A list of keys for which SVGs were successfully generated.
     """
     try:
-        # Define custom order
-        custom_order = ["animeStats", "socialStats", "mangaStats"]
-
-        # Sort keys according to custom order
-        keys.sort(
-            key=lambda x: (
-                custom_order.index(x) if x in custom_order else len(custom_order)
-            )
-        )
+        # Sort keys according to the key order
+        sort_keys(keys)
 
         # Fetch the data and generate an SVG for each key
-        data, userid = fetch_anilist_data(username, keys)
-
-        # Check if a user with the given username exists
-        user = User.query.filter_by(username=username).first()
-
-        if not user:
-            # If the user doesn't exist, create a new user
-            user = User(username=username, userid=userid)
-            db.session.add(user)
-            db.session.commit()
-        else:
-            # If the user exists but the userid is different, update the userid
-            if user.userid != userid:
-                user.userid = userid
-                db.session.commit()
+        # The user asked for new cards, so the data cached for them isn't used
+        data, _ = fetch_anilist_data(username, keys, user.userid, use_cache=False)
 
         successful_keys = []
 
-        for key in keys:
-            svg_data = generate_svg(
-                key, data.get(key) if data else None, username, colors
-            )
+        # Generate the SVGs for all keys at once
+        svgs = generate_all_svgs(
+            {key: data.get(key) if data else None for key in keys}, username, colors
+        )
 
+        for key, svg_data in svgs.items():
             if svg_data is not None:
                 successful_keys.append(
                     key
@@ -526,12 +902,7 @@ def process_keys_and_generate_svgs(username, keys, colors):
                 # Save the data in the respective table
                 record_class = key_to_class.get(key)
                 if record_class:
-                    record = record_class.query.filter_by(user_id=user.userid).first()
-                    if record:
-                        record.data = svg_data
-                    else:
-                        record = record_class(data=svg_data, user_id=user.userid)
-                        db.session.add(record)
+                    upsert_record(record_class, user.userid, svg_data)
 
         return successful_keys
     except Exception as e:
@@ -540,81 +911,113 @@ def process_keys_and_generate_svgs(username, keys, colors):
             f"{username}. Error: {str(e)}",
             "error",
         )
-        raise e
+        raise
 
 
-def process_user(user, custom_order):
+def process_user(username, userid, keys):
     """
     Process a user's data and generate SVGs for each key in their statcard.
 
     Args:
-        user (User): The user to process.
-        custom_order (list): The custom order to sort the keys in.
+        username (str): The username of the user.
+        userid (int): The AniList ID of the user.
+        keys (list): The keys in the statcard of the user.
 
     Returns:
         None
     """
-    statcard = StatCard.query.filter_by(user_id=user.userid).first()
-
-    if not statcard:
-        return
-
-    # Get the keys from the statcard
-    keys = statcard.keys.split(",")
-
-    # Sort keys according to custom order
-    keys.sort(
-        key=lambda x: (
-            custom_order.index(x) if x in custom_order else len(custom_order)
-        )
-    )
+    # Sort keys according to the key order
+    sort_keys(keys)
 
-    # Fetch the data and generate an SVG for each key
-    data = fetch_anilist_data(user.username, keys)
+    # Fetch the data, waiting out AniList's rate limit if it is hit
+    data, _ = fetch_anilist_data(username, keys, userid, retries=REGENERATE_RETRIES)
 
     # Use default colors
     colors = ["fe428e", "141321", "a9fef7", "fe428e"]
 
+    # Generate the SVGs for all keys at once
+    svgs = generate_all_svgs(
+        {key: data.get(key) if data else None for key in keys}, username, colors
+    )
+
     successful_keys = []
 
-    for key in keys:
-        user_info = {"user": user, "colors": colors}
-        process_key(key, data, user_info, successful_keys)
+    for key, svg_data in svgs.items():
+        process_key(key, svg_data, userid, successful_keys)
 
     db.session.commit()
 
 
-def process_key(key, data, user_info, successful_keys):
+def process_key(key, svg_data, userid, successful_keys):
     """
-    Process a key's data and generate an SVG for it.
+    Process a key's generated SVG and save it.
 
     Args:
         key (str): The key to process.
-        data (dict): The data to generate the SVG from.
-        user_info (dict): A dictionary containing the user and colors.
+        svg_data (str): The SVG generated for the key, or None if there was none.
+        userid (int): The AniList ID of the user the SVG belongs to.
         successful_keys (list): A list of keys that have been successfully processed.
 
     Returns:
         None
     """
-    svg_data = generate_svg(
-        key,
-        data.get(key) if data else None,
-        user_info["user"].username,
-        user_info["colors"],
-    )
     if svg_data is not None:
         successful_keys.append(key)
 
         # Save the data in the respective table
         record_class = key_to_class.get(key)
         if record_class:
-            record = record_class.query.filter_by(user_id=user_info["user"].id).first()
-            if record:
-                record.data = svg_data
-            else:
-                record = record_class(data=svg_data, user_id=user_info["user"].id)
-                db.session.add(record)
+            upsert_record(record_class, userid, svg_data)
+
+
+# How many users generate_svgs_for_all_users processes at once
+REGENERATE_WORKERS = 4
+
+# The AniList queries of generate_svgs_for_all_users are started at least a second
+# apart, which keeps the job under AniList's limit of 90 requests a minute with
+# room left for the users generating their SVGs on the site. The workers only
+# overlap the rendering and saving of the SVGs, the rate doesn't grow with them
+regenerate_rate_limiter = RateLimiter(interval=1)
+
+# How many times a user's AniList query is retried when it is rate limited anyway
+REGENERATE_RETRIES = 2
+
+
+def regenerate_user_svgs(username, userid, keys):
+    """
+    Processes a user for generate_svgs_for_all_users on one of its worker threads.
+
+    The user is processed in an app context of its own, so it gets its own
+    database session and is committed or rolled back on its own. Only plain
+    values are passed in, no objects of the session of another thread.
+
+    Args:
+        username (str): The username of the user.
+        userid (int): The AniList ID of the user.
+        keys (list): The keys in the statcard of the user.
+
+    Returns:
+        None
+    """
+    with app.app_context():
+        # A user that fails doesn't stop the SVGs of the others from updating
+        try:
+            regenerate_rate_limiter.wait()
+            start = time.perf_counter()
+            process_user(username, userid, keys)
+            if DEBUG_ENABLED:
+                log_message(
+                    f"Generated SVGs for user: {username} in "
+                    f"{time.perf_counter() - start:.2f}s",
+                    "debug",
+                )
+        except Exception as e:  # pylint: disable=W0703
+            db.session.rollback()
+            log_message(
+                f"An error occurred while generating SVGs for user: "
+                f"{username}. Error: {e}",
+                "error",
+            )
 
 
 def generate_svgs_for_all_users():
@@ -622,54 +1025,44 @@ def generate_svgs_for_all_users():
     Fetches all users from the database, generates SVGs for each user's statcard,
     and saves the SVG data in the respective tables in the database.
 
+    The users are processed by a few threads at once, so the SVGs of a user are
+    generated and saved while the data of the next users is fetched.
+
     Raises:
     Exception: If an error occurs while fetching the data or generating the SVGs.
     """
     with app.app_context():
         try:
-            # Fetch all users
-            users = User.query.order_by(User.id).all()
-
-            # Define custom order
-            custom_order = ["animeStats", "socialStats", "mangaStats"]
-
-            # Define a dictionary to map keys to classes
-
-            for user in users:
-                process_user(user, custom_order)
+            # Fetch all users that have a statcard, together with their keys
+            users = db.session.execute(select_users_with_statcards).all()
+
+            with ThreadPoolExecutor(max_workers=REGENERATE_WORKERS) as executor:
+                for username, userid, keys in users:
+                    executor.submit(
+                        regenerate_user_svgs,
+                        username,
+                        userid,
+                        StatCard.split_keys(keys),
+                    )
 
         except Exception as e:
             log_message(
                 f"An error occurred while generating SVGs for all users. Error: {e}",
                 "error",
             )
-            raise e
+            raise
 
 
-def job():
+@app.cli.command("regenerate-svgs")
+def regenerate_svgs():
     """
-    Runs the job to generate SVGs for all users.
+    Regenerates the SVGs of all users, run with `flask --app main regenerate-svgs`
+    from cron or a scheduler so the work runs outside of the server process.
     """
-    print("Running job")
+    log_message("Running job to regenerate the SVGs of all users", "info")
     generate_svgs_for_all_users()
 
 
-def run_schedule():
-    """
-    Runs the scheduler which periodically checks and runs pending jobs.
-    """
-    while True:
-        print("Running scheduler")
-        schedule.run_pending()
-        time.sleep(1)
-
-
-# schedule.every(1).minutes.do(job)
-
-# Run the scheduler in a separate thread
-scheduler_thread = Thread(target=run_schedule)
-# scheduler_thread.start()
-
 # Run the Flask app
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -0,0 +1,66 @@
+"""
+This module contains unit tests for the calculations used to generate the SVGs.
+"""
+
+import unittest
+
+from src.Program.generateSVGs import (  # pylint: disable=E0401
+    calculate_font_size,
+    calculate_milestones,
+)
+
+
+class TestGenerateSVGs(unittest.TestCase):
+    """
+    Test case for the SVG calculations.
+    """
+
+    def test_01_milestones(self):
+        """
+        Test the previous and current milestones around each milestone.
+        """
+        print("\nTesting SVG calculations...")
+        expected = {
+            0: (0, 100),
+            100: (0, 100),
+            101: (100, 250),
+            250: (100, 250),
+            251: (250, 500),
+            750: (500, 750),
+            999: (750, 1000),
+            1000: (750, 1000),
+            1001: (1000, 2000),
+            2000: (1000, 2000),
+            12345: (12000, 13000),
+        }
+        milestones_check = all(
+            calculate_milestones({"episodesWatched": count}, "episodesWatched")[:2]
+            == milestones
+            for count, milestones in expected.items()
+        )
+        self.assertTrue(milestones_check)
+        print(
+            "Milestones check: "
+            + ("\033[92m✔\033[0m" if milestones_check else "\033[91m✖\033[0m")
+        )
+
+    def test_02_font_size(self):
+        """
+        Test that the font size is only reduced as far as needed to fit the text.
+        """
+        font_size_check = (
+            calculate_font_size("Alpha49's Top Anime Genres", 18, 320) == 18
+            and calculate_font_size("x" * 40, 18, 320) == 13
+            and calculate_font_size("x" * 1000, 18, 320) == 1
+        )
+        self.assertTrue(font_size_check)
+        print(
+            "Font size check: "
+            + ("\033[92m✔\033[0m" if font_size_check else "\033[91m✖\033[0m")
+        )
+
+
+if __name__ == "__main__":
+    # Run the test suite.
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestGenerateSVGs)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -14,6 +14,7 @@ import unittest  # noqa: E402
 
 # from test_badges import TestBadgesRoute  # noqa: E402
 from test_faq import TestFaqRoute  # noqa: E402
+from test_generate_svgs import TestGenerateSVGs  # noqa: E402
 from test_home import TestHomeRoute  # noqa: E402
 from test_stat_cards import TestStatCardsRoute  # noqa: E402
 from test_user_profile import TestUserProfileRoute  # noqa: E402
@@ -30,6 +31,7 @@ def suite():
     test_suite.addTest(loader.loadTestsFromTestCase(TestStatCardsRoute))
     # test_suite.addTest(loader.loadTestsFromTestCase(TestBadgesRoute))
     test_suite.addTest(loader.loadTestsFromTestCase(TestUserProfileRoute))
+    test_suite.addTest(loader.loadTestsFromTestCase(TestGenerateSVGs))
     return test_suite
 
 